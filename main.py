@@ -1,118 +1,178 @@
-import itertools
+import math
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from operator import itemgetter
+from threading import BoundedSemaphore
 from typing import Optional, Callable
 
+import orjson
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 from terminaltables import AsciiTable
+from urllib3.util.retry import Retry
+
+HH_PER_PAGE = 100
+HH_MAX_RESULTS = 2000
+SJ_PER_PAGE = 100
+SJ_MAX_RESULTS = 500
+LANGUAGE_WORKERS = 8
+PAGE_WORKERS = 4
+MAX_REQUESTS_IN_FLIGHT = 10
+REQUEST_TIMEOUT = 10
+
+get_hh_salary_fields = itemgetter("currency", "from", "to")
+get_sj_salary_fields = itemgetter("currency", "payment_from", "payment_to")
+request_slots = BoundedSemaphore(MAX_REQUESTS_IN_FLIGHT)
+
+
+def create_session(headers: Optional[dict] = None) -> requests.Session:
+    """Create HTTP session with connection pooling, retries and common headers."""
+    retries = Retry(total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504], )
+    adapter = HTTPAdapter(pool_connections=4,
+                          pool_maxsize=MAX_REQUESTS_IN_FLIGHT,
+                          max_retries=retries, )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.headers.update(headers or {})
+    return session
+
+
+def get_hh_page(
+        session: requests.Session, area: int, language: str, page: int
+) -> dict:
+    """Retrieve one page of vacancies for language from HeadHunter."""
+    url = "https://api.hh.ru/vacancies"
+    params = {"text": language,
+              "area": area,
+              "per_page": HH_PER_PAGE,
+              "page": page, }
+    with request_slots:
+        response = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
 
-def get_hh_vacancy(area: int, language: str) -> dict:
+def get_hh_vacancy(session: requests.Session, area: int, language: str) -> dict:
     """Retrieve info about salary for one language from HeadHunter."""
-    url = "https://api.hh.ru/vacancies"
-    vacancy = {"items": [], "found": 0}
-    params = {"text": language, "area": area, "per_page": 100}
-    for page in itertools.count(1, 1):
-        params["page"] = page - 1
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        hh_vacancies = response.json()
-        vacancy["items"] += hh_vacancies["items"]
-        if page == 1:
-            vacancy["found"] = hh_vacancies["found"]
-        if page >= hh_vacancies["pages"]:
-            return vacancy
-
-
-def get_hh_vacancies(area: int, languages: tuple) -> dict:
+    first_page = get_hh_page(session, area, language, 0)
+    vacancy = {"found": first_page["found"], "sum": 0, "count": 0}
+    add_salaries(vacancy, first_page["items"], predict_hh_rub_salary)
+    pages = min(first_page["pages"], HH_MAX_RESULTS // HH_PER_PAGE)
+    fetch_page = partial(get_hh_page, session, area, language)
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        page_futures = [executor.submit(fetch_page, page) for page in range(1, pages)]
+        for page_future in as_completed(page_futures):
+            hh_vacancies = page_future.result()
+            add_salaries(vacancy, hh_vacancies["items"], predict_hh_rub_salary)
+    return vacancy
+
+
+def get_hh_vacancies(session: requests.Session, area: int, languages: tuple) -> dict:
     """Collect vacancies from HeadHunter."""
-    language_vacancies = {}
-    for language in languages:
-        language_vacancies[language] = get_hh_vacancy(area, language)
+    fetch_vacancy = partial(get_hh_vacancy, session, area)
+    with ThreadPoolExecutor(max_workers=LANGUAGE_WORKERS) as executor:
+        return dict(zip(languages, executor.map(fetch_vacancy, languages)))
 
-    return language_vacancies
 
-
-def get_sj_vacancy(client_secret: str, town: int, language: str) -> dict:
-    """Retrieve info about salary for one language from SuperJob."""
+def get_sj_page(
+        session: requests.Session, town: int, language: str, page: int
+) -> dict:
+    """Retrieve one page of vacancies for language from SuperJob."""
     url = "https://api.superjob.ru/2.0/vacancies/"
-    headers = {"X-Api-App-Id": client_secret}
-    vacancy = {"items": [], "found": 0}
     params = {"town": town,
               "keyword": language,
-              "count": 100, }
-
-    for page in itertools.count(1, 1):
-        params["page"] = page - 1
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        sj_vacancies = response.json()
-        vacancy["items"] += sj_vacancies["objects"]
-        if page == 1:
-            vacancy["found"] = sj_vacancies["total"]
-        if not sj_vacancies["more"]:
-            return vacancy
-
-
-def get_sj_vacancies(
-        client_secret: str, town: int, languages: tuple
-) -> dict:
-    """Collect vacancies from SuperJob."""
-    language_vacancies = {}
-    for language in languages:
-        language_vacancies[language] = get_sj_vacancy(client_secret, town, language)
+              "count": SJ_PER_PAGE,
+              "page": page, }
+    with request_slots:
+        response = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
 
-    return language_vacancies
+def get_sj_vacancy(session: requests.Session, town: int, language: str) -> dict:
+    """Retrieve info about salary for one language from SuperJob."""
+    first_page = get_sj_page(session, town, language, 0)
+    vacancy = {"found": first_page["total"], "sum": 0, "count": 0}
+    add_salaries(vacancy, first_page["objects"], predict_sj_rub_salary)
+    if not first_page["more"]:
+        return vacancy
+
+    available = min(first_page["total"], SJ_MAX_RESULTS)
+    pages = math.ceil(available / SJ_PER_PAGE)
+    fetch_page = partial(get_sj_page, session, town, language)
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        page_futures = [executor.submit(fetch_page, page) for page in range(1, pages)]
+        for page_future in as_completed(page_futures):
+            sj_vacancies = page_future.result()
+            add_salaries(vacancy, sj_vacancies["objects"], predict_sj_rub_salary)
+    return vacancy
+
+
+def get_sj_vacancies(session: requests.Session, town: int, languages: tuple) -> dict:
+    """Collect vacancies from SuperJob."""
+    fetch_vacancy = partial(get_sj_vacancy, session, town)
+    with ThreadPoolExecutor(max_workers=LANGUAGE_WORKERS) as executor:
+        return dict(zip(languages, executor.map(fetch_vacancy, languages)))
 
 
 def get_average_salary(payment_from: int, payment_to: int) -> Optional[int]:
     """Return average value for two payments level."""
-    if not payment_from:
-        if not payment_to:
-            return None
-        return int(payment_to * 0.8)
-    if not payment_to:
-        return int(payment_from * 1.2)
-    return (payment_from + payment_to) // 2
+    if payment_from and payment_to:
+        return (payment_from + payment_to) // 2
+    if payment_from:
+        return payment_from * 12 // 10
+    if payment_to:
+        return payment_to * 8 // 10
+    return None
 
 
 def predict_hh_rub_salary(vacancy: dict) -> Optional[int]:
     """Handle salary from one vacancy from HeadHunter."""
     salary = vacancy["salary"]
-    if not salary or salary["currency"] != "RUR":
+    if not salary:
         return None
-    return get_average_salary(salary["from"], salary["to"])
+    currency, payment_from, payment_to = get_hh_salary_fields(salary)
+    if currency != "RUR":
+        return None
+    return get_average_salary(payment_from, payment_to)
 
 
 def predict_sj_rub_salary(vacancy: dict) -> Optional[int]:
     """Handle salary from one vacancy from SuperJob."""
-    if vacancy['currency'] == 'rub':
-        return get_average_salary(vacancy["payment_from"], vacancy["payment_to"])
+    currency, payment_from, payment_to = get_sj_salary_fields(vacancy)
+    if currency == "rub":
+        return get_average_salary(payment_from, payment_to)
     return None
 
 
-def collect_average_salary(vacancies: dict, predictor: Callable) -> dict:
+def add_salaries(vacancy: dict, page_vacancies: list, predictor: Callable) -> None:
+    """Add predicted salaries of one page of vacancies to the language totals."""
+    for page_vacancy in page_vacancies:
+        rub_salary = predictor(page_vacancy)
+        if rub_salary:
+            vacancy["sum"] += rub_salary
+            vacancy["count"] += 1
+
+
+def collect_average_salary(vacancies: dict) -> dict:
     """
-    Handle all vacancies from the platform;
-    :param vacancies: vacancies from platform;
-    :param predictor: function to predict salary of vacancy;
+    Handle salary totals of all languages from the platform;
+    :param vacancies: language: {found: int, sum: int, count: int};
     :return: language: {vacancies_found: int, vacancies_processed: int, average_salary: int}.
     """
     language_salary = {}
     for language, language_vacancies in vacancies.items():
-        sum_salary = 0
-        salary_num = 0
-        for vacancy in language_vacancies["items"]:
-            rub_salary = predictor(vacancy)
-            if rub_salary:
-                sum_salary += rub_salary
-                salary_num += 1
+        salary_num = language_vacancies["count"]
         language_stat = {"vacancies_found": language_vacancies["found"],
                          "vacancies_processed": salary_num}
         if not salary_num:
             language_stat["average_salary"] = 0
         else:
-            language_stat["average_salary"] = int(sum_salary / salary_num)
+            language_stat["average_salary"] = language_vacancies["sum"] // salary_num
         language_salary[language] = language_stat
     return language_salary
 
@@ -125,10 +185,11 @@ def get_statistic_table(stats: dict, title: str) -> AsciiTable:
         "Средняя зарплата",
     ]
 
-    rows = [headers]
-
-    for language, vacancies_params in stats.items():
-        rows.append([language, *vacancies_params.values()])
+    rows = [
+        headers,
+        *([language, *vacancies_params.values()]
+          for language, vacancies_params in stats.items()),
+    ]
 
     return AsciiTable(rows, title).table
 
@@ -143,17 +204,18 @@ if __name__ == "__main__":
         "PHP",
         "Go",
         "JavaScript",
-        "Java",
         "VBA",
         "1С",
         "SQL",
     )
-    all_hh_vacancies = get_hh_vacancies(1, languages)
-    hh_average_salary = collect_average_salary(all_hh_vacancies, predict_hh_rub_salary)
+    hh_session = create_session()
+    all_hh_vacancies = get_hh_vacancies(hh_session, 1, languages)
+    hh_average_salary = collect_average_salary(all_hh_vacancies)
 
     sj_secret = os.getenv("SJ_SECRET")
-    all_sj_vacancies = get_sj_vacancies(sj_secret, 4, languages)
-    sj_average_salary = collect_average_salary(all_sj_vacancies, predict_sj_rub_salary)
+    sj_session = create_session({"X-Api-App-Id": sj_secret})
+    all_sj_vacancies = get_sj_vacancies(sj_session, 4, languages)
+    sj_average_salary = collect_average_salary(all_sj_vacancies)
 
     print(get_statistic_table(hh_average_salary, "HeadHunter Moscow"))
     print(get_statistic_table(sj_average_salary, "SuperJob Moscow"))